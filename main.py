@@ -1,7 +1,10 @@
+from multiprocessing import freeze_support
+
 from praisecharts.cli import main
 
 
 if __name__ == "__main__":
+    freeze_support()
     main()
 
 
@@ -2,14 +2,22 @@ from __future__ import annotations
 
 import argparse
 import os
+import re
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import List
 
-from .config import AppConfig, setup_logging
+from .config import AppConfig, BROWSER_WORKERS, PDF_WORKERS, URL_CHECK_WORKERS, URL_FILE_BUFFER_BYTES, setup_logging
 from .ui import ConsoleUI, safe_prompt, is_tty
-from .urls import normalize_url, is_praisecharts_song_details_url
-from .paths import get_arrangement_path, get_path_components, find_next_available_dir
-from .scraper import process_url
+from .http import SESSION
+from .urls import normalize_url, is_praisecharts_song_details_url, redirects_to_domain_root
+from .paths import get_arrangement_path, get_path_components, find_next_available_dir, list_existing_arrangements
+from .scraper import BatchExecutors, BrowserPool, process_url
+from .pdf import create_pdf_process_pool
+
+
+_URL_INPUT_RE = re.compile(r"^(?:(https?://)|(?:www\.)?praisecharts\.com/songs/details/)", re.IGNORECASE)
 
 
 def _checkbox_select_indices(index_to_label: dict[int, str]) -> list[int] | None:
@@ -25,6 +33,28 @@ def _checkbox_select_indices(index_to_label: dict[int, str]) -> list[int] | None
     return list(selected or [])
 
 
+def _parse_index_selection(ui: ConsoleUI, raw: str, valid: dict[int, tuple[str, str]]) -> list[int]:
+    if raw.strip().lower() == 'all':
+        return list(valid)
+    indices: list[int] = []
+    for token in raw.split():
+        if not token.isdecimal():
+            ui.warning(f"Invalid number: {token}")
+        elif int(token) - 1 in valid:
+            indices.append(int(token) - 1)
+        else:
+            ui.warning(f"Index out of range: {token}")
+    return indices
+
+
+def _select_conflicts(ui: ConsoleUI, conflicts: dict[int, tuple[str, str]], action: str) -> list[int]:
+    selected = _checkbox_select_indices({i: os.path.relpath(p) for i, (_, p) in conflicts.items()})
+    if selected is None:
+        user_input = safe_prompt(ui, f"Enter numbers to '{action}' (e.g., '1 2', 'all', or Enter to skip):")
+        selected = _parse_index_selection(ui, user_input, conflicts) if user_input else []
+    return [i for i in dict.fromkeys(selected) if i in conflicts]
+
+
 def interactive_flags_prompt(ui: ConsoleUI, args) -> None:
     try:
         import questionary
@@ -71,21 +101,18 @@ def classify_user_input(raw: str) -> tuple[str | None, str | None]:
     s = (raw or "").strip()
     if not s:
         return None, "Empty input."
-    low = s.lower()
-    if low.endswith('.txt') or os.path.isfile(s):
-        return "file", s
-    if os.path.isdir(s):
-        return None, f"Provided path is a directory, not a file: {s}"
-    if low.startswith("https://") or low.startswith("http://"):
-        url = normalize_url(s)
-        if url:
-            return "url", url
-        return None, f"Invalid URL: {s}"
-    if low.startswith("www.praisecharts.com/songs/details/") or low.startswith("praisecharts.com/songs/details/"):
+    url_match = _URL_INPUT_RE.match(s)
+    if url_match:
         url = normalize_url(s)
         if url:
             return "url", url
+        if url_match.group(1):
+            return None, f"Invalid URL: {s}"
         return None, f"Invalid PraiseCharts URL: {s}"
+    if s.lower().endswith('.txt') or os.path.isfile(s):
+        return "file", s
+    if os.path.isdir(s):
+        return None, f"Provided path is a directory, not a file: {s}"
     return None, "Could not determine if input is a URL or a path to a .txt file."
 
 
@@ -98,6 +125,7 @@ def main() -> None:
     parser.add_argument('url', nargs='?', help="A single URL or a .txt file path (default mode).")
     parser.add_argument('--url', dest='url_flag', help="A single URL to download (same as positional).")
     parser.add_argument('--file', help="A file containing a list of URLs.")
+    parser.add_argument('--workers', type=int, default=BROWSER_WORKERS, help=f"Number of browsers used in --file mode (default: {BROWSER_WORKERS})")
     args = parser.parse_args()
 
     if args.url and not args.file:
@@ -126,6 +154,7 @@ def main() -> None:
     cfg = AppConfig(
         download_dir=args.outdir or AppConfig.download_dir,
         browser_headless=not bool(args.headed),
+        browser_workers=max(1, args.workers),
     )
     stats = {'new': 0, 'overwritten': 0, 'renamed': 0, 'skipped': 0, 'errors': 0}
 
@@ -143,8 +172,12 @@ def main() -> None:
             if not args.file.lower().endswith('.txt'):
                 ui.error(f"Provided --file is not a .txt file: {args.file}")
                 sys.exit(1)
-            with open(args.file, 'r', encoding='utf-8') as f:
-                urls = [line.strip() for line in f if line.strip() and not line.strip().startswith('#')]
+            urls: List[str] = []
+            with open(args.file, 'r', encoding='utf-8', buffering=URL_FILE_BUFFER_BYTES) as f:
+                for line in f:
+                    entry = line.strip()
+                    if entry and entry[0] != '#':
+                        urls.append(entry)
         except UnicodeDecodeError as e:
             ui.error(f"Failed to read file (encoding issue) {args.file}: {e}")
             sys.exit(1)
@@ -154,12 +187,21 @@ def main() -> None:
 
         normalized_urls: List[str] = []
         invalid_urls: List[str] = []
+        seen_urls: set[str] = set()
+        duplicate_count = 0
         for u in urls:
             nu = normalize_url(u)
             if nu and is_praisecharts_song_details_url(nu):
+                if nu in seen_urls:
+                    duplicate_count += 1
+                    continue
+                seen_urls.add(nu)
                 normalized_urls.append(nu)
             else:
                 invalid_urls.append(u)
+        if duplicate_count:
+            ui.info(f"Ignoring {duplicate_count} duplicate URL(s).")
+            stats['skipped'] += duplicate_count
         if invalid_urls:
             ui.warning("Some entries are not valid PraiseCharts song URLs and will be skipped:")
             for bad in invalid_urls[:10]:
@@ -167,13 +209,42 @@ def main() -> None:
             if len(invalid_urls) > 10:
                 ui.info(f"... and {len(invalid_urls) - 10} more")
             stats['skipped'] += len(invalid_urls)
+        with ThreadPoolExecutor(max_workers=URL_CHECK_WORKERS) as executor:
+            redirected = list(executor.map(lambda u: redirects_to_domain_root(u, SESSION), normalized_urls))
+        dead_urls = [u for u, dead in zip(normalized_urls, redirected) if dead]
+        if dead_urls:
+            ui.warning("Some URLs appear invalid (redirect to the domain root or not found) and will be skipped:")
+            for bad in dead_urls[:10]:
+                ui.item('-', bad)
+            if len(dead_urls) > 10:
+                ui.info(f"... and {len(dead_urls) - 10} more")
+            stats['skipped'] += len(dead_urls)
+            normalized_urls = [u for u, dead in zip(normalized_urls, redirected) if not dead]
         if not normalized_urls:
             ui.warning("No valid URLs to process.")
             sys.exit(0)
         urls = normalized_urls
 
-        conflicts = {i: (url, get_arrangement_path(url, cfg.download_dir)) for i, url in enumerate(urls) if os.path.exists(get_arrangement_path(url, cfg.download_dir))}
-        non_conflicts = [(url, get_arrangement_path(url, cfg.download_dir)) for i, url in enumerate(urls) if i not in conflicts]
+        existing = list_existing_arrangements(cfg.download_dir)
+        paths = [get_arrangement_path(url, cfg.download_dir) for url in urls]
+        conflicts: dict[int, tuple[str, str]] = {}
+        non_conflicts: list[tuple[str, str]] = []
+        # Tasks run in parallel, so no two of them may write the same folder.
+        reserved: set[str] = set()
+        same_path_count = 0
+        for i, (url, path) in enumerate(zip(urls, paths)):
+            key = os.path.normcase(path)
+            if key in reserved:
+                same_path_count += 1
+                continue
+            reserved.add(key)
+            if key in existing:
+                conflicts[i] = (url, path)
+            else:
+                non_conflicts.append((url, path))
+        if same_path_count:
+            ui.info(f"Ignoring {same_path_count} URL(s) that resolve to an arrangement already in the list.")
+            stats['skipped'] += same_path_count
         tasks: list[tuple[str, str]] = []
 
         if conflicts:
@@ -182,79 +253,68 @@ def main() -> None:
             for i, (_, path) in conflicts.items():
                 ui.item(i + 1, os.path.relpath(path))
 
-            selected = _checkbox_select_indices({i: os.path.relpath(p) for i, (_, p) in conflicts.items()})
-            if selected:
-                for i in selected:
-                    if i in conflicts:
-                        url, path = conflicts.pop(i)
-                        tasks.append((url, path))
-                        stats['overwritten'] += 1
-            elif selected is None:
-                user_input = safe_prompt(ui, "Enter numbers to 'Overwrite' (e.g., '1 2', 'all', or Enter to skip):")
-                if user_input:
-                    if user_input.lower() == 'all':
-                        indices = list(conflicts.keys())
-                    else:
-                        indices = []
-                        for token in user_input.split():
-                            try:
-                                idx = int(token) - 1
-                                if idx in conflicts:
-                                    indices.append(idx)
-                                else:
-                                    ui.warning(f"Index out of range: {token}")
-                            except ValueError:
-                                ui.warning(f"Invalid number: {token}")
-                    for i in indices:
-                        if i in conflicts:
-                            url, path = conflicts.pop(i)
-                            tasks.append((url, path))
-                            stats['overwritten'] += 1
+            for i in _select_conflicts(ui, conflicts, "Overwrite"):
+                url, path = conflicts.pop(i)
+                tasks.append((url, path))
+                stats['overwritten'] += 1
 
             if conflicts:
-                selected_n = _checkbox_select_indices({i: os.path.relpath(p) for i, (_, p) in conflicts.items()})
-                if selected_n:
-                    for i in selected_n:
-                        if i in conflicts:
-                            url, path = conflicts.pop(i)
-                            final_path = find_next_available_dir(path)
-                            tasks.append((url, final_path))
-                            stats['renamed'] += 1
-                elif selected_n is None:
-                    user_input = safe_prompt(ui, "Enter numbers to 'Add number' (e.g., '1 2', 'all', or Enter to skip):")
-                    if user_input:
-                        if user_input.lower() == 'all':
-                            indices = list(conflicts.keys())
-                        else:
-                            indices = []
-                            for token in user_input.split():
-                                try:
-                                    idx = int(token) - 1
-                                    if idx in conflicts:
-                                        indices.append(idx)
-                                    else:
-                                        ui.warning(f"Index out of range: {token}")
-                                except ValueError:
-                                    ui.warning(f"Invalid number: {token}")
-                        for i in indices:
-                            if i in conflicts:
-                                url, path = conflicts.pop(i)
-                                final_path = find_next_available_dir(path)
-                                tasks.append((url, final_path))
-                                stats['renamed'] += 1
-
-        stats['skipped'] = len(conflicts)
+                for i in _select_conflicts(ui, conflicts, "Add number"):
+                    url, path = conflicts.pop(i)
+                    final_path = find_next_available_dir(path, reserved)
+                    reserved.add(os.path.normcase(final_path))
+                    tasks.append((url, final_path))
+                    stats['renamed'] += 1
+
+        stats['skipped'] += len(conflicts)
         tasks.extend(non_conflicts)
         stats['new'] += len(non_conflicts)
 
         ui.header("Processing Queue")
-        for i, (url, path) in enumerate(tasks):
+        browsers = BrowserPool(ui, cfg, min(cfg.browser_workers, len(tasks)))
+        stats_lock = threading.Lock()
+
+        def run_task(i: int, url: str, path: str) -> None:
             ui.info(f"[{i+1}/{len(tasks)}] Queued: {get_path_components(url)[0]} -> {os.path.relpath(path)}")
+            driver = None
             try:
-                process_url(ui, cfg, url, path)
+                driver = browsers.acquire()
+                if driver is None:
+                    ui.error(f"Skipping {url}: no browser could be started.")
+                    with stats_lock:
+                        stats['errors'] += 1
+                    return
+                process_url(ui, cfg, url, path, driver=driver, batch=batch)
             except Exception as e:
                 ui.error(f"Failed to process {url}: {e}")
-                stats['errors'] += 1
+                with stats_lock:
+                    stats['errors'] += 1
+            finally:
+                browsers.release(driver)
+
+        pdf_pool = create_pdf_process_pool()
+        pdf_executor = ThreadPoolExecutor(max_workers=PDF_WORKERS)
+        downloads = ThreadPoolExecutor(max_workers=max(1, cfg.download_workers))
+        batch = BatchExecutors(downloads=downloads, pdf_executor=pdf_executor, pdf_pool=pdf_pool)
+        executor = ThreadPoolExecutor(max_workers=max(1, cfg.browser_workers))
+        try:
+            for future in [executor.submit(run_task, i, url, path) for i, (url, path) in enumerate(tasks)]:
+                future.result()
+            executor.shutdown()
+            browsers.close()
+            pdf_executor.shutdown()
+            downloads.shutdown()
+            pdf_pool.shutdown()
+            # finish() has already reported each failure; only the count is left.
+            stats['errors'] += sum(1 for future in batch.pdf_futures if future.exception() is not None)
+        except BaseException:
+            # Ctrl+C: drop queued URLs, downloads and PDFs instead of draining them.
+            batch.stop()
+            for pending in (executor, downloads, pdf_executor, pdf_pool):
+                pending.shutdown(wait=False, cancel_futures=True)
+            raise
+        finally:
+            browsers.close()
 
     elif args.url or args.url_flag:
         single = args.url or args.url_flag
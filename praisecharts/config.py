@@ -7,9 +7,44 @@ from dataclasses import dataclass
 DEFAULT_DOWNLOAD_DIR = "charts"
 HTTP_TIMEOUT_SECONDS = 20
 HTTP_HEAD_TIMEOUT_SECONDS = 10
-REQUEST_CHUNK_BYTES = 8192
+REQUEST_CHUNK_BYTES = 1024 * 1024
+STREAM_THRESHOLD_BYTES = 16 * 1024 * 1024
+ETAG_SUFFIX = ".etag"
+IMAGE_CACHE_DIRNAME = ".cache"
 SELENIUM_WAIT_SECONDS = 10
 PAGE_CHANGE_WAIT_SECONDS = 3
+WAIT_POLL_SECONDS = 0.1
+DOWNLOAD_WORKERS = 8
+BROWSER_WORKERS = 2
+URL_CHECK_WORKERS = 16
+URL_FILE_BUFFER_BYTES = 64 * 1024
+PDF_WORKERS = 2
+MAX_SHEET_PAGES = 200
+SHEET_PROBE_BATCH = 8
+HTTP_POOL_CONNECTIONS = 32
+HTTP_POOL_MAXSIZE = 64
+HTTP_RETRIES = 3
+HTTP_BACKOFF_FACTOR = 0.3
+HTTP_RETRY_STATUSES = (429, 500, 502, 503, 504)
+HTTP_SOCKET_RCVBUF_BYTES = 1024 * 1024
+HTTP_READ_BLOCKSIZE_BYTES = 64 * 1024
+
+FIREFOX_PREFERENCES: dict[str, object] = {
+    "permissions.default.image": 2,
+    "browser.display.use_document_fonts": 0,
+    "dom.ipc.processCount": 1,
+    "browser.cache.disk.enable": False,
+    "media.autoplay.default": 5,
+    "privacy.trackingprotection.enabled": True,
+    "browser.safebrowsing.malware.enabled": False,
+    "browser.safebrowsing.phishing.enabled": False,
+    "browser.safebrowsing.downloads.enabled": False,
+    "network.prefetch-next": False,
+    "network.dns.disablePrefetch": True,
+    "network.http.speculative-parallel-limit": 0,
+}
+GECKODRIVER_PATH_ENV = "GECKODRIVER_PATH"
+PAGE_LOAD_STRATEGY = "eager"
 
 
 @dataclass(slots=True)
@@ -21,6 +56,9 @@ class AppConfig:
     request_chunk_bytes: int = REQUEST_CHUNK_BYTES
     selenium_wait_seconds: int = SELENIUM_WAIT_SECONDS
     page_change_wait_seconds: int = PAGE_CHANGE_WAIT_SECONDS
+    wait_poll_seconds: float = WAIT_POLL_SECONDS
+    download_workers: int = DOWNLOAD_WORKERS
+    browser_workers: int = BROWSER_WORKERS
 
 
 def setup_logging(debug_mode: bool) -> None:
@@ -1,12 +1,36 @@
 from __future__ import annotations
 
 import atexit
+import hashlib
 import os
+import re
+import shutil
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Final
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.util.retry import Retry
 
-from .config import REQUEST_CHUNK_BYTES, HTTP_TIMEOUT_SECONDS
+from .config import (
+    STREAM_THRESHOLD_BYTES,
+    ETAG_SUFFIX,
+    REQUEST_CHUNK_BYTES,
+    HTTP_TIMEOUT_SECONDS,
+    HTTP_HEAD_TIMEOUT_SECONDS,
+    HTTP_POOL_CONNECTIONS,
+    HTTP_POOL_MAXSIZE,
+    HTTP_RETRIES,
+    HTTP_BACKOFF_FACTOR,
+    HTTP_RETRY_STATUSES,
+    HTTP_SOCKET_RCVBUF_BYTES,
+    HTTP_READ_BLOCKSIZE_BYTES,
+    MAX_SHEET_PAGES,
+    SHEET_PROBE_BATCH,
+)
 from .ui import ConsoleUI
 
 
@@ -18,28 +42,236 @@ REQUEST_HEADERS: Final[dict[str, str]] = {
     )
 }
 
+_SHEET_PAGE_RE = re.compile(r"^(.*_)(\d{3})(\.png)$", re.IGNORECASE)
+
+
+class _TunedHTTPAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        kwargs.setdefault("socket_options", HTTPConnection.default_socket_options + [
+            (socket.SOL_SOCKET, socket.SO_RCVBUF, HTTP_SOCKET_RCVBUF_BYTES),
+        ])
+        kwargs.setdefault("blocksize", HTTP_READ_BLOCKSIZE_BYTES)
+        super().init_poolmanager(*args, **kwargs)
+
+
 SESSION = requests.Session()
+SESSION.headers.update(REQUEST_HEADERS)
+_ADAPTER = _TunedHTTPAdapter(
+    pool_connections=HTTP_POOL_CONNECTIONS,
+    pool_maxsize=HTTP_POOL_MAXSIZE,
+    max_retries=Retry(
+        total=HTTP_RETRIES,
+        backoff_factor=HTTP_BACKOFF_FACTOR,
+        status_forcelist=HTTP_RETRY_STATUSES,
+        allowed_methods=frozenset({"GET", "HEAD"}),
+    ),
+)
+SESSION.mount("https://", _ADAPTER)
+SESSION.mount("http://", _ADAPTER)
 atexit.register(lambda: SESSION.close())
 
+# Shared by every arrangement so concurrent URLs do not multiply the HEAD probes.
+_PROBE_POOL = ThreadPoolExecutor(max_workers=SHEET_PROBE_BATCH, thread_name_prefix="sheet-probe")
+
+
+_ENSURED_DIRS: set[str] = set()
+
+
+def _ensure_dir(dirpath: str) -> None:
+    if dirpath in _ENSURED_DIRS:
+        return
+    os.makedirs(dirpath, exist_ok=True)
+    _ENSURED_DIRS.add(dirpath)
+
+
+def _create_exclusive(filepath: str) -> int | None:
+    dirpath = os.path.dirname(filepath)
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+    _ensure_dir(dirpath)
+    try:
+        return os.open(filepath, flags)
+    except FileExistsError:
+        return None
+    except FileNotFoundError:
+        # The directory was removed (e.g. overwritten) after it was memoized.
+        _ENSURED_DIRS.discard(dirpath)
+        _ensure_dir(dirpath)
+        try:
+            return os.open(filepath, flags)
+        except FileExistsError:
+            return None
+
+
+def _discard_file(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _read_etag(etag_path: str) -> str | None:
+    try:
+        with open(etag_path, "r", encoding="utf-8") as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
 
-def download_image(ui: ConsoleUI, url: str, filepath: str) -> None:
+def _write_etag(etag_path: str, etag: str | None) -> None:
+    if not etag:
+        return
     try:
-        if os.path.exists(filepath):
+        with open(etag_path, "w", encoding="utf-8") as f:
+            f.write(etag)
+    except OSError:
+        pass
+
+
+def _remote_metadata(url: str) -> tuple[int | None, str | None]:
+    with SESSION.head(url, allow_redirects=True, timeout=HTTP_HEAD_TIMEOUT_SECONDS) as response:
+        response.raise_for_status()
+        value = response.headers.get("Content-Length", "")
+        etag = response.headers.get("ETag")
+    return (int(value) if value.isdigit() else None), etag
+
+
+def _cache_path(cache_dir: str, url: str) -> str:
+    key = hashlib.sha1(url.partition("?")[0].encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir, key)
+
+
+def _link_from_cache(cache_path: str, filepath: str) -> bool:
+    _ensure_dir(os.path.dirname(filepath))
+    try:
+        os.link(cache_path, filepath)
+        return True
+    except OSError:
+        return False
+
+
+def _store_in_cache(filepath: str, cache_path: str, etag: str | None) -> None:
+    # Link under a temporary name and swap it in, so a refreshed image
+    # replaces the cached copy instead of failing against it.
+    tmp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}"
+    try:
+        _ensure_dir(os.path.dirname(cache_path))
+        os.link(filepath, tmp_path)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        return
+    finally:
+        # rename() keeps both names when they already link the same file.
+        _discard_file(tmp_path)
+    # The tag travels with the entry so cache-linked images can still revalidate.
+    cache_etag_path = f"{cache_path}{ETAG_SUFFIX}"
+    if etag:
+        _write_etag(cache_etag_path, etag)
+    else:
+        _discard_file(cache_etag_path)
+
+
+def download_image(ui: ConsoleUI, url: str, filepath: str, cache_dir: str | None = None) -> None:
+    fd: int | None = None
+    claimed = False
+    complete = False
+    etag_path = f"{filepath}{ETAG_SUFFIX}"
+    cache_path = _cache_path(cache_dir, url) if cache_dir else None
+    try:
+        headers: dict[str, str] = {}
+        local_size = 0
+        if cache_path is not None and _link_from_cache(cache_path, filepath):
+            _write_etag(etag_path, _read_etag(f"{cache_path}{ETAG_SUFFIX}"))
+            ui.info(f"Linked {os.path.basename(filepath)} from cache")
             return
-        ui.info(f"Downloading {os.path.basename(filepath)}")
-        with SESSION.get(url, headers=REQUEST_HEADERS, stream=True, timeout=HTTP_TIMEOUT_SECONDS) as response:
+        fd = _create_exclusive(filepath)
+        if fd is None:
+            etag = _read_etag(etag_path)
+            if etag:
+                headers = {"If-None-Match": etag}
+            else:
+                local_size = os.path.getsize(filepath)
+                try:
+                    remote_size, remote_etag = _remote_metadata(url)
+                except requests.exceptions.RequestException:
+                    # No way to check it (HEAD refused or offline); keep what is on disk.
+                    return
+                if remote_size is None or local_size == remote_size:
+                    _write_etag(etag_path, remote_etag)
+                    if cache_path is not None:
+                        _store_in_cache(filepath, cache_path, remote_etag)
+                    return
+                # Appending to a hard-linked file would also change the cached copy.
+                if 0 < local_size < remote_size and os.stat(filepath).st_nlink == 1:
+                    headers = {"Range": f"bytes={local_size}-"}
+                    ui.info(f"Resuming {os.path.basename(filepath)} at {local_size} of {remote_size} bytes")
+                else:
+                    local_size = 0
+                    ui.info(f"Re-downloading {os.path.basename(filepath)} (size mismatch)")
+        else:
+            claimed = True
+            ui.info(f"Downloading {os.path.basename(filepath)}")
+        with SESSION.get(url, headers=headers, stream=True, timeout=HTTP_TIMEOUT_SECONDS) as response:
+            if response.status_code == 304:
+                if cache_path is not None:
+                    _store_in_cache(filepath, cache_path, response.headers.get("ETag") or headers.get("If-None-Match"))
+                return
             response.raise_for_status()
             content_type = response.headers.get("Content-Type", "")
             if "image" not in content_type.lower():
                 ui.warning(f"Unexpected content type for {url}: {content_type}")
                 return
-            os.makedirs(os.path.dirname(filepath), exist_ok=True)
-            with open(filepath, "wb") as f:
-                for chunk in response.iter_content(chunk_size=REQUEST_CHUNK_BYTES):
-                    f.write(chunk)
+            mode = "ab" if local_size and response.status_code == 206 else "wb"
+            if fd is not None:
+                f = os.fdopen(fd, mode, buffering=REQUEST_CHUNK_BYTES)
+                fd = None
+            else:
+                _discard_file(etag_path)
+                if mode == "wb":
+                    _discard_file(filepath)
+                f = open(filepath, mode, buffering=REQUEST_CHUNK_BYTES)
+            length = response.headers.get("Content-Length", "")
+            with f:
+                if length.isdigit() and int(length) <= STREAM_THRESHOLD_BYTES:
+                    f.write(response.content)
+                else:
+                    response.raw.decode_content = True
+                    shutil.copyfileobj(response.raw, f, length=REQUEST_CHUNK_BYTES)
+            complete = True
+            etag = response.headers.get("ETag")
+            _write_etag(etag_path, etag)
+            if cache_path is not None:
+                _store_in_cache(filepath, cache_path, etag)
     except requests.exceptions.RequestException as e:
         ui.error(f"Failed to download {url}: {e}")
     except OSError as e:
         ui.error(f"Filesystem error while saving {filepath}: {e}")
+    finally:
+        if fd is not None:
+            os.close(fd)
+        if claimed and not complete:
+            _discard_file(filepath)
+
+
+def _sheet_page_exists(url: str) -> bool:
+    try:
+        with SESSION.head(url, allow_redirects=True, timeout=HTTP_HEAD_TIMEOUT_SECONDS) as response:
+            return response.status_code == 200
+    except requests.exceptions.RequestException:
+        return False
 
 
+def enumerate_sheet_urls(first_url: str, limit: int = MAX_SHEET_PAGES) -> list[str]:
+    base, sep, query = first_url.partition("?")
+    match = _SHEET_PAGE_RE.match(base)
+    if not match:
+        return [first_url]
+    prefix, index, suffix = match.groups()
+    urls = [first_url]
+    pages = range(int(index) + 1, limit + 1)
+    for start in range(0, len(pages), SHEET_PROBE_BATCH):
+        candidates = [f"{prefix}{page:03d}{suffix}{sep}{query}" for page in pages[start:start + SHEET_PROBE_BATCH]]
+        for candidate, exists in zip(candidates, _PROBE_POOL.map(_sheet_page_exists, candidates)):
+            if not exists:
+                return urls
+            urls.append(candidate)
+    return urls
@@ -2,21 +2,22 @@ from __future__ import annotations
 
 import os
 import re
-from urllib.parse import urlparse
+from collections.abc import Collection
+from functools import lru_cache
 
 from .config import DEFAULT_DOWNLOAD_DIR
 
 
+_INSTRUMENT_RE = re.compile(r"_([a-zA-Z0-9-]+)_(?:[A-Z]|All)_")
+_SONG_PATH_RE = re.compile(r"^[^?#]*?/\d+/([^/?#]+)(?:/([^/?#]+))?")
+
+
+@lru_cache(maxsize=None)
 def get_path_components(url: str) -> tuple[str, str]:
-    try:
-        path_parts = urlparse(url).path.strip("/").split("/")
-        id_index = next((i for i, part in enumerate(path_parts) if part.isdigit()), -1)
-        if id_index != -1 and id_index + 1 < len(path_parts):
-            song_slug = path_parts[id_index + 1].removesuffix("-sheet-music")
-            arrangement_slug = path_parts[id_index + 2] if id_index + 2 < len(path_parts) else "default"
-            return song_slug, arrangement_slug
-    except Exception:
-        pass
+    match = _SONG_PATH_RE.search(url)
+    if match:
+        song_slug = match.group(1).removesuffix("-sheet-music")
+        return song_slug, match.group(2) or "default"
     return "unknown-song", "unknown-arrangement"
 
 
@@ -25,17 +26,40 @@ def get_arrangement_path(url: str, download_dir: str = DEFAULT_DOWNLOAD_DIR) ->
     return os.path.join(download_dir, song_slug, arrangement_slug)
 
 
-def find_next_available_dir(base_path: str) -> str:
+def list_existing_arrangements(download_dir: str = DEFAULT_DOWNLOAD_DIR) -> set[str]:
+    existing: set[str] = set()
+    try:
+        with os.scandir(download_dir) as songs:
+            for song in songs:
+                # Dot folders such as the image cache are not songs.
+                if song.name.startswith(".") or not song.is_dir():
+                    continue
+                try:
+                    with os.scandir(song.path) as arrangements:
+                        existing.update(os.path.normcase(entry.path) for entry in arrangements)
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return existing
+
+
+def find_next_available_dir(base_path: str, reserved: Collection[str] = ()) -> str:
+    parent, name = os.path.split(base_path)
+    prefix = f"{name}_"
+    try:
+        with os.scandir(parent or ".") as entries:
+            taken = {entry.name[len(prefix):] for entry in entries if entry.name.startswith(prefix)}
+    except OSError:
+        taken = set()
     counter = 1
-    while True:
-        new_path = f"{base_path}_{counter}"
-        if not os.path.exists(new_path):
-            return new_path
+    while str(counter) in taken or os.path.normcase(f"{base_path}_{counter}") in reserved:
         counter += 1
+    return f"{base_path}_{counter}"
 
 
 def get_instrument_from_filename(filename: str) -> str:
-    match = re.search(r"_([a-zA-Z0-9-]+)_(?:[A-Z]|All)_", filename)
+    match = _INSTRUMENT_RE.search(filename)
     return match.group(1) if match else "unknown-instrument"
 
 
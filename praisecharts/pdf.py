@@ -1,67 +1,154 @@
 from __future__ import annotations
 
+import multiprocessing
 import os
 import re
+from concurrent.futures import BrokenExecutor, Executor, ProcessPoolExecutor
 from PIL import Image
 
 from .ui import ConsoleUI
 
+try:
+    import img2pdf
+except Exception:
+    img2pdf = None
 
-def create_pdfs_from_images(ui: ConsoleUI, arrangement_dir_path: str) -> None:
+
+_PAGE_RE = re.compile(r'_(\d{3})\.png$', re.IGNORECASE)
+_PASSTHROUGH_MODES = frozenset({'RGB', 'L', 'P', '1'})
+_PILLOW_PDF_MODES = frozenset({'RGB', 'L', 'CMYK'})
+
+
+def _page_sort_key(filename: str) -> tuple[bool, int, str]:
+    match = _PAGE_RE.search(filename)
+    return (match is None, int(match.group(1)) if match else 0, filename)
+
+
+def _is_opaque(image_path: str) -> bool:
+    with Image.open(image_path) as img:
+        return img.mode in _PASSTHROUGH_MODES and "transparency" not in img.info
+
+
+def _build_one_pdf(instrument_path: str, images: list[str], pdf_path: str) -> None:
+    tmp_path = f"{pdf_path}.part"
+    image_paths = [os.path.join(instrument_path, name) for name in images]
+    if img2pdf is not None and all(_is_opaque(path) for path in image_paths):
+        try:
+            with open(tmp_path, 'wb') as f:
+                img2pdf.convert(image_paths, outputstream=f)
+            os.replace(tmp_path, pdf_path)
+            return
+        except Exception:
+            pass
+    try:
+        for i, image_path in enumerate(image_paths):
+            with Image.open(image_path) as img:
+                page = img if img.mode in _PILLOW_PDF_MODES else img.convert('RGB')
+                try:
+                    page.save(tmp_path, 'PDF', append=i > 0)
+                finally:
+                    if page is not img:
+                        page.close()
+        os.replace(tmp_path, pdf_path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def create_pdf_process_pool(max_workers: int | None = None) -> ProcessPoolExecutor:
+    # Spawned workers are safe to start while download and browser threads are running.
+    return ProcessPoolExecutor(
+        max_workers=max_workers or os.cpu_count() or 1,
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+
+
+def create_pdfs_from_images(
+    ui: ConsoleUI,
+    arrangement_dir_path: str,
+    executor: Executor | None = None,
+) -> None:
     if not os.path.isdir(arrangement_dir_path):
         ui.warning(f"Arrangement path is not a directory or does not exist: {arrangement_dir_path}")
         return
     ui.header(f"Creating PDFs for {arrangement_dir_path}")
     try:
-        instrument_dirs = [
-            d for d in os.listdir(arrangement_dir_path)
-            if os.path.isdir(os.path.join(arrangement_dir_path, d))
-        ]
+        with os.scandir(arrangement_dir_path) as entries:
+            instrument_dirs: list[tuple[str, str]] = []
+            existing_files: set[str] = set()
+            for entry in entries:
+                if entry.is_dir():
+                    instrument_dirs.append((entry.name, entry.path))
+                else:
+                    existing_files.add(entry.name)
     except OSError as e:
         ui.error(f"Failed to list directory {arrangement_dir_path}: {e}")
         return
-    for instrument in instrument_dirs:
-        instrument_path = os.path.join(arrangement_dir_path, instrument)
+    jobs: list[tuple[str, str, list[str], str]] = []
+    for instrument, instrument_path in instrument_dirs:
         try:
-            images = [
-                f for f in os.listdir(instrument_path)
-                if os.path.isfile(os.path.join(instrument_path, f)) and f.lower().endswith('.png')
-            ]
+            with os.scandir(instrument_path) as entries:
+                images = [
+                    entry.name for entry in entries
+                    if entry.name.lower().endswith('.png') and entry.is_file()
+                ]
         except OSError as e:
             ui.error(f"Failed to list images in {instrument_path}: {e}")
             continue
         if not images:
             continue
+        if f"{instrument}.pdf" in existing_files:
+            continue
+        images.sort(key=_page_sort_key)
+        pdf_path = os.path.join(arrangement_dir_path, f"{instrument}.pdf")
+        jobs.append((instrument, instrument_path, images, pdf_path))
 
-        def sort_key(filename: str):
-            match = re.search(r'_(\d{3})\.png$', filename, re.IGNORECASE)
-            return (match is None, int(match.group(1)) if match else 0, filename)
+    if not jobs:
+        return
+    if len(jobs) == 1:
+        _build_pdf_inline(ui, jobs[0])
+        return
 
-        images.sort(key=sort_key)
-        pdf_path = os.path.join(arrangement_dir_path, f"{instrument}.pdf")
-        if os.path.exists(pdf_path):
-            continue
+    if executor is None:
+        with create_pdf_process_pool(min(len(jobs), os.cpu_count() or 1)) as pool:
+            _run_pdf_jobs(ui, pool, jobs)
+    else:
+        _run_pdf_jobs(ui, executor, jobs)
+
+
+def _build_pdf_inline(ui: ConsoleUI, job: tuple[str, str, list[str], str]) -> None:
+    instrument, instrument_path, images, pdf_path = job
+    try:
+        _build_one_pdf(instrument_path, images, pdf_path)
+        ui.success(f"Created {os.path.basename(pdf_path)}")
+    except Exception as e:
+        ui.error(f"Failed to create PDF for {instrument}: {e}")
 
-        image_objects: list[Image.Image] = []
+
+def _run_pdf_jobs(ui: ConsoleUI, executor: Executor, jobs: list[tuple[str, str, list[str], str]]) -> None:
+    futures = []
+    for job in jobs:
+        _, instrument_path, images, pdf_path = job
         try:
-            for i, image_name in enumerate(images):
-                img_path = os.path.join(instrument_path, image_name)
-                img = Image.open(img_path).convert('RGB')
-                if i == 0:
-                    first_image = img
-                else:
-                    image_objects.append(img)
-            first_image.save(pdf_path, save_all=True, append_images=image_objects)  # type: ignore[name-defined]
-            ui.success(f"Created {os.path.basename(pdf_path)}")
+            futures.append((job, executor.submit(_build_one_pdf, instrument_path, images, pdf_path)))
+        except BrokenExecutor:
+            futures.append((job, None))
+    for job, future in futures:
+        instrument, _, _, pdf_path = job
+        try:
+            if future is not None:
+                future.result()
+        except BrokenExecutor:
+            future = None
         except Exception as e:
             ui.error(f"Failed to create PDF for {instrument}: {e}")
-        finally:
-            try:
-                for img in image_objects:
-                    img.close()
-                if 'first_image' in locals():
-                    first_image.close()  # type: ignore[name-defined]
-            except Exception:
-                pass
-
-
+            continue
+        if future is None:
+            # A crashed worker takes the whole pool down; build in this process instead.
+            ui.warning(f"PDF worker pool is unavailable; building {instrument}.pdf in this process.")
+            _build_pdf_inline(ui, job)
+        else:
+            ui.success(f"Created {os.path.basename(pdf_path)}")
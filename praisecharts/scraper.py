@@ -1,28 +1,271 @@
 from __future__ import annotations
 
+import atexit
 import os
 import shutil
+import threading
+from dataclasses import dataclass, field
+from functools import lru_cache
+from urllib.parse import urlparse
+from concurrent.futures import CancelledError, Executor, Future, ThreadPoolExecutor
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.firefox.options import Options as FirefoxOptions
+from selenium.webdriver.firefox.service import Service as FirefoxService
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import (
     TimeoutException,
-    NoSuchElementException,
     WebDriverException,
     SessionNotCreatedException,
 )
 
-from .config import AppConfig
-from .http import download_image, SESSION
+from .config import (
+    AppConfig,
+    FIREFOX_PREFERENCES,
+    ETAG_SUFFIX,
+    GECKODRIVER_PATH_ENV,
+    IMAGE_CACHE_DIRNAME,
+    MAX_SHEET_PAGES,
+    PAGE_LOAD_STRATEGY,
+)
+from .http import download_image, enumerate_sheet_urls
 from .ui import ConsoleUI
 from .paths import get_instrument_from_filename
 from .pdf import create_pdfs_from_images
-from .urls import normalize_url, is_praisecharts_song_details_url, redirects_to_domain_root
+from .urls import normalize_url, is_praisecharts_song_details_url
+
+
+COLLECT_SHEETS_SCRIPT = """
+const [firstName, timeoutMs, maxPages, done] = arguments;
+const nameOf = (src) => src.split('?')[0].split('/').pop();
+const currentSrc = () => {
+    const second = document.querySelectorAll('.sheet-wrapper')[1];
+    const img = second && second.querySelector('img');
+    return img ? img.src : null;
+};
+const urls = Array.from(document.querySelectorAll('.sheet-wrapper img'), (img) => img.src).filter(Boolean);
+const root = document.querySelector('app-product-sheet-preview') || document.body;
+const advance = (src) => new Promise((resolve) => {
+    const second = document.querySelectorAll('.sheet-wrapper')[1];
+    const button = second && second.querySelector('button');
+    if (!button) {
+        resolve(null);
+        return;
+    }
+    let timer = null;
+    const observer = new MutationObserver(() => {
+        const next = currentSrc();
+        if (next && next !== src) {
+            observer.disconnect();
+            clearTimeout(timer);
+            resolve(next);
+        }
+    });
+    observer.observe(root, {subtree: true, childList: true, attributeFilter: ['src']});
+    timer = setTimeout(() => {
+        observer.disconnect();
+        resolve(null);
+    }, timeoutMs);
+    button.click();
+});
+(async () => {
+    let src = currentSrc();
+    let complete = false;
+    for (let i = 0; i < maxPages && src; i++) {
+        if (nameOf(src) === firstName) {
+            complete = true;
+            break;
+        }
+        urls.push(src);
+        src = await advance(src);
+    }
+    done({urls: urls, complete: complete});
+})().catch(() => done({urls: urls, complete: false}));
+"""
+
+
+def build_firefox_options(cfg: AppConfig) -> FirefoxOptions:
+    options = FirefoxOptions()
+    options.page_load_strategy = PAGE_LOAD_STRATEGY
+    if cfg.browser_headless:
+        options.add_argument("--headless")
+    for name, value in FIREFOX_PREFERENCES.items():
+        options.set_preference(name, value)
+    return options
+
+
+@lru_cache(maxsize=None)
+def _geckodriver_path() -> str | None:
+    return os.environ.get(GECKODRIVER_PATH_ENV) or shutil.which("geckodriver")
+
+
+def _new_firefox(cfg: AppConfig) -> webdriver.Firefox:
+    # A resolved path skips the Selenium Manager lookup on every launch.
+    service = FirefoxService(executable_path=_geckodriver_path(), log_output=os.devnull)
+    return webdriver.Firefox(options=build_firefox_options(cfg), service=service)
 
 
-def process_url(ui: ConsoleUI, cfg: AppConfig, url: str, target_path: str) -> None:
+def launch_browser(ui: ConsoleUI, cfg: AppConfig) -> webdriver.Firefox | None:
+    try:
+        return _new_firefox(cfg)
+    except (WebDriverException, SessionNotCreatedException) as e:
+        ui.error(f"Browser automation failed: {e}")
+        ui.info("Ensure Firefox and geckodriver are installed and compatible with your Selenium version.")
+        return None
+    except Exception as e:
+        ui.error(f"Failed to start the browser: {e}")
+        return None
+
+
+def quit_browser(driver: webdriver.Firefox | None) -> None:
+    try:
+        if driver is not None:
+            driver.quit()
+    except Exception:
+        pass
+
+
+def _browser_alive(driver: webdriver.Firefox) -> bool:
+    try:
+        _ = driver.current_url
+        return True
+    except Exception:
+        return False
+
+
+class BrowserPool:
+    def __init__(self, ui: ConsoleUI, cfg: AppConfig, size: int) -> None:
+        self._ui = ui
+        self._cfg = cfg
+        self._size = max(1, size)
+        self._idle: list[webdriver.Firefox] = []
+        self._drivers: list[webdriver.Firefox] = []
+        self._launched = 0
+        self._cond = threading.Condition()
+        atexit.register(self.close)
+
+    def acquire(self) -> webdriver.Firefox | None:
+        with self._cond:
+            while not self._idle and self._launched >= self._size:
+                self._cond.wait()
+            if self._idle:
+                return self._idle.pop()
+            self._launched += 1
+        try:
+            driver = launch_browser(self._ui, self._cfg)
+        except BaseException:
+            with self._cond:
+                self._launched -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            if driver is None:
+                self._launched -= 1
+                self._cond.notify()
+            else:
+                self._drivers.append(driver)
+        return driver
+
+    def release(self, driver: webdriver.Firefox | None) -> None:
+        if driver is None:
+            return
+        # A crashed or disconnected browser is retired so its slot can be relaunched.
+        if not _browser_alive(driver):
+            self.discard(driver)
+            return
+        with self._cond:
+            if driver in self._drivers:
+                self._idle.append(driver)
+                self._cond.notify()
+
+    def discard(self, driver: webdriver.Firefox) -> None:
+        with self._cond:
+            if driver in self._drivers:
+                self._drivers.remove(driver)
+                self._launched -= 1
+            self._cond.notify()
+        quit_browser(driver)
+
+    def close(self) -> None:
+        with self._cond:
+            drivers, self._drivers = self._drivers, []
+            self._idle.clear()
+            self._launched = 0
+            self._cond.notify_all()
+        for driver in drivers:
+            quit_browser(driver)
+
+
+def _reset_browser(driver: webdriver.Firefox) -> None:
+    try:
+        driver.delete_all_cookies()
+        driver.get("about:blank")
+    except Exception:
+        pass
+
+
+def _remove_pdfs(arrangement_dir_path: str) -> None:
+    with os.scandir(arrangement_dir_path) as entries:
+        for entry in entries:
+            if entry.name.lower().endswith('.pdf') and entry.is_file():
+                os.remove(entry.path)
+
+
+def _remove_stale_images(arrangement_dir_path: str, keep: set[str]) -> None:
+    with os.scandir(arrangement_dir_path) as instruments:
+        instrument_paths = [entry.path for entry in instruments if entry.is_dir() and not entry.name.startswith('.')]
+    for instrument_path in instrument_paths:
+        with os.scandir(instrument_path) as entries:
+            for entry in entries:
+                name = entry.name.removesuffix(ETAG_SUFFIX)
+                if name.lower().endswith('.png') and name not in keep and entry.is_file():
+                    os.remove(entry.path)
+        try:
+            os.rmdir(instrument_path)
+        except OSError:
+            pass
+
+
+def _wait_for(futures: list[Future[None]]) -> None:
+    # wait() never wakes for futures cancelled by shutdown(cancel_futures=True).
+    for future in futures:
+        try:
+            future.exception()
+        except CancelledError:
+            pass
+
+
+@dataclass(slots=True)
+class BatchExecutors:
+    """Executors shared by every URL of a batch; the caller owns and shuts them down."""
+    downloads: Executor
+    pdf_executor: Executor
+    pdf_pool: Executor
+    pdf_futures: list[Future[None]] = field(default_factory=list)
+    stopping: bool = field(default=False, init=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def submit(self, executor: Executor, fn, *args) -> Future | None:
+        # Once stop() has run, in-flight URLs stop queueing work instead of failing on shut-down executors.
+        with self._lock:
+            if self.stopping:
+                return None
+            return executor.submit(fn, *args)
+
+    def stop(self) -> None:
+        with self._lock:
+            self.stopping = True
+
+
+def process_url(
+    ui: ConsoleUI,
+    cfg: AppConfig,
+    url: str,
+    target_path: str,
+    driver: webdriver.Firefox | None = None,
+    batch: BatchExecutors | None = None,
+) -> None:
     normalized = normalize_url(url)
     if not normalized:
         ui.error(f"Invalid URL: {url}")
@@ -30,15 +273,12 @@ def process_url(ui: ConsoleUI, cfg: AppConfig, url: str, target_path: str) -> No
     if not is_praisecharts_song_details_url(normalized):
         ui.error("Unsupported URL. Expected something like 'praisecharts.com/songs/details/...'")
         return
-    if redirects_to_domain_root(normalized, SESSION):
-        ui.error(f"URL appears invalid (redirects to domain root): {url}")
-        return
-
+    overwriting = os.path.isdir(target_path)
     if os.path.exists(target_path):
         try:
-            if os.path.isdir(target_path):
+            if overwriting:
                 ui.warning(f"Overwriting directory: {target_path}")
-                shutil.rmtree(target_path)
+                _remove_pdfs(target_path)
             else:
                 ui.warning(f"A file exists at target path; removing file: {target_path}")
                 os.remove(target_path)
@@ -46,73 +286,121 @@ def process_url(ui: ConsoleUI, cfg: AppConfig, url: str, target_path: str) -> No
             ui.error(f"Failed to clear target path '{target_path}': {e}")
             return
 
-    driver = None
+    # A batch shares one download pool so concurrent URLs stay within download_workers.
+    pool = batch.downloads if batch else ThreadPoolExecutor(max_workers=cfg.download_workers)
+    futures: list[Future[None]] = []
+    probes: list[Future[None]] = []
+    submitted: set[str] = set()
+    submitted_lock = threading.Lock()
+    cache_dir = os.path.join(cfg.download_dir, IMAGE_CACHE_DIRNAME)
+    scraped = False
+
+    def schedule(into: list[Future[None]], executor: Executor, fn, *args) -> None:
+        future = batch.submit(executor, fn, *args) if batch else executor.submit(fn, *args)
+        if future is not None:
+            into.append(future)
+
+    def enqueue_download(image_url: str, image_filename: str) -> None:
+        with submitted_lock:
+            if image_filename in submitted:
+                return
+            submitted.add(image_filename)
+        instrument = get_instrument_from_filename(image_filename)
+        filepath = os.path.join(target_path, instrument, image_filename)
+        schedule(futures, pool, download_image, ui, image_url, filepath, cache_dir)
+
+    def prefetch_sheet_pages(first_url: str) -> None:
+        for sheet_url in enumerate_sheet_urls(first_url):
+            enqueue_download(sheet_url, os.path.basename(sheet_url.split('?')[0]))
+
+    def finish() -> None:
+        try:
+            build_outputs()
+        except Exception as e:
+            ui.error(f"Failed to finish {target_path}: {e}")
+            raise
+
+    def build_outputs() -> None:
+        _wait_for(probes)
+        _wait_for(futures)
+        if batch is None:
+            pool.shutdown()
+        for future in probes + futures:
+            exc = None if future.cancelled() else future.exception()
+            if exc is not None:
+                ui.error(f"Download task failed: {exc}")
+        if overwriting and scraped:
+            # Pages the server no longer serves would otherwise end up in the rebuilt PDFs.
+            try:
+                _remove_stale_images(target_path, submitted)
+            except OSError as e:
+                ui.warning(f"Failed to remove stale images from {target_path}: {e}")
+        if os.path.isdir(target_path) and not (batch and batch.stopping):
+            create_pdfs_from_images(ui, target_path, batch.pdf_pool if batch else None)
+
+    owns_driver = driver is None
     try:
-        options = FirefoxOptions()
-        if cfg.browser_headless:
-            options.add_argument("--headless")
-        driver = webdriver.Firefox(options=options)
-        wait = WebDriverWait(driver, cfg.selenium_wait_seconds)
+        if driver is None:
+            driver = _new_firefox(cfg)
+        wait = WebDriverWait(driver, cfg.selenium_wait_seconds, poll_frequency=cfg.wait_poll_seconds)
 
         driver.get(normalized)
+        if (urlparse(driver.current_url).path or "/") == "/":
+            ui.error(f"URL appears invalid (redirects to domain root): {url}")
+            return
         spinner_selector = (By.CSS_SELECTOR, '.spinner, .loading, .overlay, .app-spinner')
+        preview_selector = (By.CSS_SELECTOR, 'app-product-sheet-preview')
         try:
-            wait.until(EC.invisibility_of_element_located(spinner_selector))
+            wait.until(EC.any_of(
+                EC.invisibility_of_element_located(spinner_selector),
+                EC.visibility_of_element_located(preview_selector),
+            ))
         except TimeoutException:
             ui.warning("Spinner did not disappear in time, continuing anyway.")
 
-        _ = wait.until(EC.visibility_of_element_located((By.CSS_SELECTOR, 'app-product-sheet-preview')))
-        first_image_element = wait.until(EC.visibility_of_element_located((By.CSS_SELECTOR, '.sheet-wrapper:nth-child(1) img')))
-        first_image_url = first_image_element.get_attribute('src')
+        _ = wait.until(EC.presence_of_element_located(preview_selector))
+        first_image_url = wait.until(
+            lambda d: d.find_element(By.CSS_SELECTOR, '.sheet-wrapper:nth-child(1) img').get_attribute('src')
+        )
         if not first_image_url:
             ui.error("Could not locate first preview image URL.")
             return
         first_image_filename = os.path.basename(first_image_url.split('?')[0])
 
-        instrument = get_instrument_from_filename(first_image_filename)
-        download_image(ui, first_image_url, os.path.join(target_path, instrument, first_image_filename))
+        enqueue_download(first_image_url, first_image_filename)
+        schedule(probes, pool, prefetch_sheet_pages, first_image_url)
 
-        while True:
-            sheet_wrappers = driver.find_elements(By.CSS_SELECTOR, '.sheet-wrapper')
-            if len(sheet_wrappers) < 2:
-                break
-            try:
-                second_wrapper = sheet_wrappers[1]
-                second_image_element = second_wrapper.find_element(By.TAG_NAME, 'img')
-                current_image_url = second_image_element.get_attribute('src')
-                if not current_image_url:
-                    break
-                current_image_filename = os.path.basename(current_image_url.split('?')[0])
-
-                if current_image_filename == first_image_filename:
-                    break
-
-                instrument = get_instrument_from_filename(current_image_filename)
-                download_image(ui, current_image_url, os.path.join(target_path, instrument, current_image_filename))
-
-                next_button = second_wrapper.find_element(By.TAG_NAME, 'button')
-                driver.execute_script("arguments[0].click();", next_button)
-
-                WebDriverWait(driver, cfg.page_change_wait_seconds).until(
-                    lambda d: d.find_element(By.CSS_SELECTOR, '.sheet-wrapper:nth-child(2) img').get_attribute('src') != current_image_url
-                )
-            except (TimeoutException, NoSuchElementException):
-                break
-            except Exception as e:
-                ui.error(f"Error in loop: {e}")
-                break
+        wait_seconds = cfg.page_change_wait_seconds
+        sheet_urls: list[str] = []
+        try:
+            driver.set_script_timeout(wait_seconds * (MAX_SHEET_PAGES + 1))
+            walk = driver.execute_async_script(
+                COLLECT_SHEETS_SCRIPT, first_image_filename, wait_seconds * 1000, MAX_SHEET_PAGES
+            ) or {}
+            sheet_urls = walk.get('urls') or []
+            # Only a walk that looped back to the first page saw every sheet.
+            scraped = bool(walk.get('complete'))
+            if overwriting and not scraped:
+                ui.warning("Sheet preview did not loop back to the first page; keeping existing images.")
+        except TimeoutException:
+            ui.warning("Timed out while paging through sheets.")
+        except Exception as e:
+            ui.error(f"Error in loop: {e}")
+        for sheet_url in sheet_urls:
+            enqueue_download(sheet_url, os.path.basename(sheet_url.split('?')[0]))
     except (WebDriverException, SessionNotCreatedException) as e:
         ui.error(f"Browser automation failed: {e}")
         ui.info("Ensure Firefox and geckodriver are installed and compatible with your Selenium version.")
     except Exception as e:
         ui.error(f"Unexpected error during processing: {e}")
     finally:
-        try:
-            if driver is not None:
-                driver.quit()
-        except Exception:
-            pass
-        if os.path.isdir(target_path):
-            create_pdfs_from_images(ui, target_path)
+        if owns_driver:
+            quit_browser(driver)
+        elif driver is not None:
+            _reset_browser(driver)
+        if batch is None:
+            finish()
+        else:
+            schedule(batch.pdf_futures, batch.pdf_executor, finish)
 
 
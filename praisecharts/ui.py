@@ -4,30 +4,43 @@ import sys
 from colorama import init, Fore, Style
 
 
+_HEADER_PREFIX = f"\n{Style.BRIGHT}{Fore.MAGENTA}--- "
+_INFO_PREFIX = f"{Fore.CYAN}>> "
+_SUCCESS_PREFIX = f"{Fore.GREEN}✔  "
+_WARNING_PREFIX = f"{Fore.YELLOW}⚠  "
+_ERROR_PREFIX = f"{Fore.RED}✖  "
+_PROMPT_PREFIX = f"{Fore.YELLOW}? "
+_ITEM_PREFIX = f"  {Style.BRIGHT}"
+
+
 class ConsoleUI:
     def __init__(self) -> None:
         init(autoreset=True)
 
+    def _write(self, line: str) -> None:
+        # One write per line keeps messages from concurrent workers intact.
+        sys.stdout.write(line)
+
     def header(self, text: str) -> None:
-        print(f"\n{Style.BRIGHT}{Fore.MAGENTA}--- {text} ---")
+        self._write(_HEADER_PREFIX + text + " ---\n")
 
     def info(self, message: str) -> None:
-        print(f"{Fore.CYAN}>> {message}")
+        self._write(_INFO_PREFIX + message + "\n")
 
     def success(self, message: str) -> None:
-        print(f"{Fore.GREEN}✔  {message}")
+        self._write(_SUCCESS_PREFIX + message + "\n")
 
     def warning(self, message: str) -> None:
-        print(f"{Fore.YELLOW}⚠  {message}")
+        self._write(_WARNING_PREFIX + message + "\n")
 
     def error(self, message: str) -> None:
-        print(f"{Fore.RED}✖  {message}")
+        self._write(_ERROR_PREFIX + message + "\n")
 
     def prompt(self, question: str) -> str:
-        return input(f"{Fore.YELLOW}? {question} ")
+        return input(_PROMPT_PREFIX + question + " ")
 
     def item(self, index: int | str, text: str) -> None:
-        print(f"  {Style.BRIGHT}{index}. {text}")
+        self._write(f"{_ITEM_PREFIX}{index}. {text}\n")
 
 
 def safe_prompt(ui: ConsoleUI, question: str, default: str = "") -> str:
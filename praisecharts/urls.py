@@ -1,11 +1,21 @@
 from __future__ import annotations
 
-from urllib.parse import urlparse
+import re
+from functools import lru_cache
+from urllib.parse import urljoin, urlparse
 import requests
 
 from .config import HTTP_HEAD_TIMEOUT_SECONDS
 
 
+_REDIRECT_STATUSES = frozenset({301, 302, 303, 307, 308})
+_SONG_DETAILS_RE = re.compile(
+    r"^https?://(?:[a-z0-9-]+\.)*praisecharts\.com(?::\d+)?/(?:[^?#]*/)?songs/details/",
+    re.IGNORECASE,
+)
+
+
+@lru_cache(maxsize=2048)
 def normalize_url(raw: str) -> str | None:
     try:
         if not raw:
@@ -25,6 +35,13 @@ def normalize_url(raw: str) -> str | None:
         return None
 
 
+def _lands_on_domain_root(response: requests.Response, original_path: str) -> bool:
+    final_path = urlparse(response.url).path or "/"
+    if final_path == "/" and original_path != "/":
+        return True
+    return getattr(response, "status_code", 200) == 404
+
+
 def redirects_to_domain_root(url: str, session: requests.Session) -> bool:
     try:
         original = urlparse(url)
@@ -32,23 +49,20 @@ def redirects_to_domain_root(url: str, session: requests.Session) -> bool:
         if original_path in ("", "/"):
             return False
         try:
-            with session.head(url, allow_redirects=True, timeout=HTTP_HEAD_TIMEOUT_SECONDS) as head_resp:
-                if head_resp.status_code == 405:
-                    with session.get(url, allow_redirects=True, timeout=HTTP_HEAD_TIMEOUT_SECONDS) as get_resp:
-                        final = urlparse(get_resp.url)
-                        final_path = final.path or "/"
-                        if final_path == "/" and original_path != "/":
-                            return True
-                        if getattr(get_resp, "status_code", 200) == 404:
-                            return True
-                        return False
-                final = urlparse(head_resp.url)
-                final_path = final.path or "/"
-                if final_path == "/" and original_path != "/":
+            with session.head(url, allow_redirects=False, timeout=HTTP_HEAD_TIMEOUT_SECONDS) as head_resp:
+                status = head_resp.status_code
+                location = head_resp.headers.get("Location", "")
+            if status == 404:
+                return True
+            if status in _REDIRECT_STATUSES and location:
+                if (urlparse(urljoin(url, location)).path or "/") == "/":
                     return True
-                if getattr(head_resp, "status_code", 200) == 404:
-                    return True
-                return False
+                with session.head(url, allow_redirects=True, timeout=HTTP_HEAD_TIMEOUT_SECONDS) as final_resp:
+                    return _lands_on_domain_root(final_resp, original_path)
+            if status == 405:
+                with session.get(url, allow_redirects=True, timeout=HTTP_HEAD_TIMEOUT_SECONDS) as get_resp:
+                    return _lands_on_domain_root(get_resp, original_path)
+            return False
         except requests.exceptions.RequestException:
             return False
     except Exception:
@@ -56,15 +70,4 @@ def redirects_to_domain_root(url: str, session: requests.Session) -> bool:
 
 
 def is_praisecharts_song_details_url(url: str) -> bool:
-    try:
-        normalized = normalize_url(url)
-        if not normalized:
-            return False
-        parsed = urlparse(normalized)
-        if not parsed.netloc.endswith("praisecharts.com"):
-            return False
-        return "/songs/details/" in (parsed.path or "")
-    except Exception:
-        return False
-
-
+    return bool(url) and _SONG_DETAILS_RE.match(url) is not None